@@ -8,43 +8,88 @@ Behavior:
 - First row of each file is treated as header.
 - Files that share the same header are merged into a single CSV.
 - Files with different headers produce separate merged CSV outputs.
+- Inputs with the same content as an earlier input are skipped.
 - If any line/row in a file is malformed (wrong column count or CSV parse error),
   that row is skipped and the original file is copied into `error_files/`.
 - All outputs are saved as UTF-8 CSVs into the common parent folder of inputs.
 
 Notes:
-- For reading Excel files this script uses openpyxl.
+- For reading Excel files this script uses python-calamine, falling back to openpyxl.
+- CSV files are parsed with pyarrow when available, otherwise with the csv module.
 - For better encoding detection it optionally uses chardet.
 - It raises CSV field size limit to avoid "field larger than field limit" errors.
 
 Requirements:
-    pip install openpyxl
+    pip install python-calamine   # or: pip install openpyxl
     pip install chardet   # optional but recommended
+    pip install pyarrow   # optional, faster CSV parsing
 
 Usage:
     python app.py file1.csv file2.xlsx ...
+    python app.py --concat a.csv b.csv   # byte-copy fast path for same-header UTF-8 CSVs
     # or
     python app.py            # opens a file selection dialog (tkinter required)
 """
 from pathlib import Path
 import argparse
+import codecs
 import csv
+import datetime
+import filecmp
 import sys
 import os
+import re
 import shutil
 import hashlib
-from typing import List, Tuple, Iterable
+import io
+import itertools
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple, Iterable
 
 # Optional dependencies
+try:
+    from python_calamine import CalamineWorkbook
+except Exception:
+    CalamineWorkbook = None
+
 try:
     import openpyxl
 except Exception:
     openpyxl = None
 
 try:
-    import chardet
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
 except Exception:
-    chardet = None
+    pa = None
+    pacsv = None
+
+try:
+    import cchardet as chardet
+except Exception:
+    try:
+        import chardet
+    except Exception:
+        chardet = None
+
+CSV_EXTENSIONS = (".csv", ".txt")
+EXCEL_EXTENSIONS = (".xlsx", ".xlsm", ".xltx", ".xltm", ".xls")
+OUTPUT_BUFFER_SIZE = 4 * 1024 * 1024
+# Rows are passed from readers to the writer in lists of this many rows
+ROW_BATCH_SIZE = 1024
+# Encoding groups, as canonical codec names (see _codec_name)
+UTF8_ENCODINGS = ("utf-8", "utf-8-sig", "ascii")
+# Encodings in which b"\n" and b'"' only ever mean newline and quote,
+# so a file can be split at byte offsets
+SPLITTABLE_ENCODINGS = UTF8_ENCODINGS + ("cp1252", "iso8859-1")
+# Large CSVs are parsed in this many bytes per worker process
+PARALLEL_CSV_MIN_SIZE = 64 << 20
+PARALLEL_CSV_CHUNK_SIZE = 32 << 20
+# Bytes per block read by pyarrow's streaming CSV reader
+ARROW_BLOCK_SIZE = 8 << 20
 
 # Increase CSV field size limit to avoid field-too-large errors
 try:
@@ -59,68 +104,487 @@ except Exception:
     pass
 
 
-def detect_encoding(path: Path, sample_size: int = 131072) -> str:
+# Detected encodings, keyed by (path, mtime, size) so a file is only sniffed once
+_enc_cache: Dict[Tuple[Path, float, int], str] = {}
+
+_ASCII_BYTES = bytes(range(128))
+
+
+def _codec_name(encoding: str) -> str:
+    """Canonical name of an encoding (utf8, UTF_8 -> utf-8; latin-1 -> iso8859-1), for comparisons."""
+    try:
+        return codecs.lookup(encoding).name
+    except LookupError:
+        return encoding.lower()
+
+
+def detect_encoding(path: Path, sample_size: int = 131072, chunk_size: int = 4096) -> str:
     """
-    Try to detect file encoding. If chardet is available, use it on a sample.
+    Try to detect file encoding from its first sample_size bytes. Files starting
+    with a UTF-8 BOM or whose whole sample is ASCII are reported as UTF-8 without
+    further sniffing. If chardet is available, feed it the sample in small chunks
+    and stop as soon as it is confident.
     Otherwise try a list of common encodings and return the first that works.
-    Fallback: 'utf-8'.
+    Results are cached per file. Fallback: 'utf-8'.
     """
+    try:
+        st = path.stat()
+        cache_key = (path, st.st_mtime, st.st_size)
+    except OSError:
+        cache_key = None
+    if cache_key is not None and cache_key in _enc_cache:
+        return _enc_cache[cache_key]
+
+    enc = _detect_encoding_uncached(path, sample_size, chunk_size)
+    if cache_key is not None:
+        _enc_cache[cache_key] = enc
+    return enc
+
+
+def _detect_encoding_uncached(path: Path, sample_size: int, chunk_size: int) -> str:
+    try:
+        with path.open('rb') as f:
+            sample = f.read(sample_size)
+    except Exception:
+        return 'utf-8'
+
+    # fast path: a UTF-8 BOM or an all-ASCII sample needs no sniffing
+    if sample.startswith(b'\xef\xbb\xbf'):
+        return 'utf-8-sig'
+    if not sample.translate(None, _ASCII_BYTES):
+        return 'utf-8'
+
     if chardet:
         try:
-            with path.open('rb') as f:
-                raw = f.read(sample_size)
-            result = chardet.detect(raw)
-            enc = result.get('encoding') or 'utf-8'
-            return enc
+            detector = chardet.UniversalDetector()
+            for start in range(0, len(sample), chunk_size):
+                detector.feed(sample[start:start + chunk_size])
+                if detector.done:
+                    break
+            detector.close()
+            return detector.result.get('encoding') or 'utf-8'
         except Exception:
             return 'utf-8'
 
-    # fallback: try common encodings
+    # fallback: try common encodings on the whole sample
+    # (final=False, since the sample may end in the middle of a character)
     for enc in ('utf-8-sig', 'utf-8', 'cp1252', 'latin1', 'iso-8859-1'):
         try:
-            with path.open('r', encoding=enc, errors='strict') as f:
-                f.read(2048)
+            codecs.getincrementaldecoder(enc)(errors='strict').decode(sample, final=False)
             return enc
         except Exception:
             continue
     return 'utf-8'
 
 
-def sanitize_header(header: List[str]) -> Tuple[str, int]:
+def merged_output_path(output_dir: Path, header_key: str, key_bytes: bytes) -> Path:
+    """Output CSV for a header group: merged_<header_name>_<hash>.csv"""
+    return output_dir / f"merged_{sanitize_filename(header_key)}_{short_hash(key_bytes)}.csv"
+
+
+def short_hash(data: bytes) -> str:
+    """8-hex-char BLAKE2b digest, used only as a short suffix to tell outputs and inputs apart."""
+    return hashlib.blake2b(data, digest_size=4).hexdigest()
+
+
+def sanitize_header(header: List[str]) -> Tuple[str, bytes, int]:
+    """Returns: (header_key, header_key encoded as UTF-8, column_count)"""
     norm = [str(h).strip() for h in header]
     key = "|".join(norm)
-    return key, len(norm)
+    return key, key.encode("utf-8"), len(norm)
+
+
+class _FilenameCharMap(dict):
+    """str.translate table for sanitize_filename, filled in lazily per code point."""
+
+    def __missing__(self, codepoint: int) -> str:
+        ch = chr(codepoint)
+        out = ch if (ch.isalnum() or ch in "_-") else "_"
+        self[codepoint] = out
+        return out
+
+
+_FILENAME_CHARS = _FilenameCharMap()
+_UNDERSCORES_RE = re.compile(r"_{2,}")
 
 
 def sanitize_filename(s: str, max_len: int = 200) -> str:
-    s2 = s.lower()
-    out = []
-    for ch in s2:
-        if ch.isalnum() or ch in " _-":
-            out.append(ch)
-        else:
-            out.append("_")
-    name = "".join(out).replace(" ", "_")
-    if len(name) > max_len:
-        name = name[:max_len]
-    while "__" in name:
-        name = name.replace("__", "_")
-    name = name.strip("_")
+    name = s.lower().translate(_FILENAME_CHARS)[:max_len]
+    name = _UNDERSCORES_RE.sub("_", name).strip("_")
     return name or "merged"
 
 
-def read_csv_rows(path: Path) -> Tuple[List[str], Iterable[List[str]], bool]:
+def open_sequential(path: Path, encoding: str, errors: str):
     """
-    Read header and a generator of rows from CSV file.
-    Returns: (header_list, rows_generator, had_error)
-    - had_error is True if any row was skipped or a parse/decoding error occurred.
+    Open a text file for a single front-to-back pass.
+    Where supported, tells the kernel to read ahead aggressively.
+    """
+    f = open(path, "r", encoding=encoding, errors=errors, newline="")
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+    return f
+
+
+def close_sequential(f):
+    """Close a file from open_sequential, letting the kernel drop its cached pages."""
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        except (OSError, ValueError):
+            pass
+    f.close()
+
+
+class ReadStatus:
+    """
+    Error flag returned by the readers. Rows are read lazily, so it is only
+    final once the batches have been consumed; test it with bool().
+    """
+
+    __slots__ = ("had_error",)
+
+    def __init__(self, had_error: bool = False):
+        self.had_error = had_error
+
+    def __bool__(self):
+        return self.had_error
+
+
+def _read_csv_rows_arrow(path: Path, encoding: str) -> Optional[Tuple[List[str], Iterable[List[List[str]]], ReadStatus]]:
+    """
+    Read a UTF-8 CSV file with pyarrow's streaming reader (C++ tokenizer, all columns kept as strings).
+    Returns the same tuple as read_csv_rows, or None if the file is not UTF-8 or
+    arrow cannot parse the start of it, so the caller can fall back to the csv module.
+    If a later block fails (e.g. on an invalid UTF-8 byte), the rest of the file
+    from the first record of that block is read with the csv module instead.
+    """
+    # other encodings would go through a Python codec called from arrow's
+    # threads, which is slow and has aborted the interpreter at exit
+    if _codec_name(encoding) not in UTF8_ENCODINGS:
+        return None
+    status = ReadStatus()
+    try:
+        with open(path, "r", encoding=encoding, newline="") as f:
+            header_reader = csv.reader(f)
+            header = next(header_reader)
+            # skip_rows skips one physical line, so a quoted header spanning
+            # several lines would leave its tail behind as a data row
+            if header_reader.line_num != 1:
+                return None
+    except Exception:
+        return None
+    header_clean = [h.strip() for h in header]
+    expected_cols = len(header_clean)
+    if expected_cols == 0:
+        return None
+
+    # record numbers (header = 1) arrow handed to on_invalid_row, so a csv
+    # module fallback can tell where arrow stopped and not report them twice
+    invalid_rows = set()
+
+    def on_invalid_row(row):
+        invalid_rows.add(row.number)
+        # blank lines are kept (so row numbers count them, as in the csv module
+        # path) and skipped quietly when they don't have the full column count
+        try:
+            cells = next(csv.reader(io.StringIO(row.text, newline="")), [])
+        except csv.Error:
+            cells = [row.text]
+        if not "".join(cells).strip():
+            return "skip"
+        status.had_error = True
+        print(
+            f"Skipping malformed row {row.number} in {path.name}: expected {row.expected_columns} columns, found {row.actual_columns}"
+        )
+        return "skip"
+
+    column_names = [f"c{i}" for i in range(expected_cols)]
+    try:
+        reader = pacsv.open_csv(
+            str(path),
+            read_options=pacsv.ReadOptions(
+                skip_rows=1,
+                column_names=column_names,
+                block_size=ARROW_BLOCK_SIZE,
+                # arrow decodes UTF-8 natively and skips a BOM by itself
+                encoding="utf8",
+            ),
+            parse_options=pacsv.ParseOptions(
+                newlines_in_values=True, ignore_empty_lines=False, invalid_row_handler=on_invalid_row
+            ),
+            convert_options=pacsv.ConvertOptions(column_types={name: pa.string() for name in column_names}),
+        )
+    except Exception:
+        return None
+    try:
+        first = reader.read_next_batch()
+    except StopIteration:
+        first = None
+    except Exception:
+        reader.close()
+        return None
+
+    def gen():
+        record_batch = first
+        delivered = 0  # records arrow returned in batches
+        try:
+            while record_batch is not None:
+                delivered += record_batch.num_rows
+                for offset in range(0, record_batch.num_rows, ROW_BATCH_SIZE):
+                    part = record_batch.slice(offset, ROW_BATCH_SIZE)
+                    rows = list(zip(*[col.to_pylist() for col in part.columns]))
+                    # skip blank lines (all cells empty), same as the csv module path
+                    batch = [r for r in rows if r[0].strip() or "".join(r).strip()]
+                    if batch:
+                        yield batch
+                try:
+                    record_batch = reader.read_next_batch()
+                except StopIteration:
+                    record_batch = None
+        except Exception as e:
+            status.had_error = True
+            print(f"CSV parsing error in {path.name}: {e}; reading the rest with the csv module")
+        else:
+            return
+        finally:
+            try:
+                reader.close()
+            except Exception:
+                pass
+        yield from _rest_with_csv(delivered)
+
+    def _rest_with_csv(delivered):
+        # A whole block failed. Records before it were either returned in batches
+        # or passed to on_invalid_row; count the latter up to where arrow stopped.
+        # (One right at the boundary may belong to either block; it is skipped
+        # either way, so counting it is harmless.)
+        done = delivered
+        for number in sorted(invalid_rows):
+            if number - 1 > done + 1:
+                break
+            done += 1
+
+        def on_malformed(line, found):
+            if done + 1 + line in invalid_rows:
+                return
+            status.had_error = True
+            print(
+                f"Skipping malformed row {done + 1 + line} in {path.name}: expected {expected_cols} columns, found {found}"
+            )
+
+        def on_error(line, e):
+            status.had_error = True
+            print(f"CSV parsing error in {path.name} at line {done + 1 + line}: {e}")
+
+        with open(path, "r", encoding=encoding, errors="replace", newline="") as f:
+            # header plus the records arrow already read
+            for _ in itertools.islice(csv.reader(f), done + 1):
+                pass
+            yield from _csv_batches(f, expected_cols, on_malformed, on_error)
+
+    return header_clean, gen(), status
+
+
+def _csv_batches(stream, expected_cols: int, on_malformed, on_error) -> Iterable[List[List[str]]]:
+    """
+    Parse a CSV text stream (positioned after the header) into row batches.
+    Blank lines are skipped; malformed rows are passed to on_malformed(line, columns),
+    with lines (records) counted from 1 at the start of the stream. An exception
+    while reading is passed to on_error(line, exc) and ends the stream.
+    The generator's return value is (records read, last record), the last record
+    including skipped ones.
+    """
+    line_no = 0
+    batch = []
+    row = None
+    try:
+        for row in csv.reader(stream):
+            line_no += 1
+            # blank line: csv.reader cells are always str, so test the
+            # first cell and only join the row when that one is blank
+            if not row or (not row[0].strip() and not "".join(row).strip()):
+                continue
+            if len(row) != expected_cols:
+                on_malformed(line_no, len(row))
+                continue
+            batch.append(row)
+            if len(batch) >= ROW_BATCH_SIZE:
+                yield batch
+                batch = []
+    except Exception as e:
+        on_error(line_no + 1, e)
+    if batch:
+        yield batch
+    return line_no, row
+
+
+def parse_csv_chunk(path: Path, start: int, end: int, encoding: str, expected_cols: int):
+    """
+    Worker for parallel CSV reads: parse bytes [start, end) of path.
+    Returns: (batches, malformed, records_read, split, error_message)
+    split is True if the parser says the range may have ended inside a quoted
+    field, in which case the caller must not trust the next range.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    error = None
+    try:
+        text = data.decode(encoding)
+    except UnicodeDecodeError as e:
+        error = f"decoding error: {e}"
+        text = data.decode(encoding, errors="replace")
+    malformed = []
+    parse_errors = []
+    batches = []
+    rows = _csv_batches(
+        io.StringIO(text, newline=""),
+        expected_cols,
+        lambda line, found: malformed.append((line, found)),
+        lambda line, e: parse_errors.append(e),
+    )
+    try:
+        while True:
+            batches.append(next(rows))
+    except StopIteration as stop:
+        records, last_row = stop.value
+    # Outside quotes the range ends with a record's line break, which the
+    # parser consumes; a last field that still ends in a newline means EOF came
+    # inside an open quote. That is a guess (a quoted value may really end in
+    # a newline), but a wrong guess only costs a serial re-read. A parse error
+    # is handled the same way, so the serial reader reports it in context.
+    split = bool(parse_errors) or bool(last_row) and last_row[-1].endswith("\n")
+    return batches, malformed, records, split, error
+
+
+def _read_csv_rows_chunked(path: Path, encoding: str, size: int, workers: int):
+    """
+    Read a large CSV by parsing PARALLEL_CSV_CHUNK_SIZE byte ranges in worker processes.
+    Each range starts after a newline; at most 2 x workers ranges are in flight
+    and results are yielded in file order. If a range turns out to end inside a
+    quoted field (a quoted value spanning lines was split), the rest of the file
+    from that range on is parsed serially instead.
+    Returns the same tuple as read_csv_rows, or None if the header can't be read.
+    """
+    status = ReadStatus()
+    try:
+        with open(path, "rb") as f:
+            # readline() only stops at \n, so cap it: a file with CR-only line
+            # endings would otherwise be read whole as its "header"
+            header_line = f.readline(PARALLEL_CSV_CHUNK_SIZE)
+            # a quoted header spanning several lines can't be skipped with readline()
+            if not header_line.endswith(b"\n") or header_line.count(b'"') % 2:
+                return None
+            data_start = f.tell()
+            bounds = [data_start]
+            for offset in range(data_start + PARALLEL_CSV_CHUNK_SIZE, size, PARALLEL_CSV_CHUNK_SIZE):
+                f.seek(offset)
+                # no \n within a chunk's length: merge this range into the next one
+                if f.readline(PARALLEL_CSV_CHUNK_SIZE).endswith(b"\n") and bounds[-1] < f.tell() < size:
+                    bounds.append(f.tell())
+            bounds.append(size)
+        header = next(csv.reader([header_line.decode(encoding)]), [])
+    except (OSError, UnicodeDecodeError, csv.Error):
+        return None
+    header_clean = [h.strip() for h in header]
+    expected_cols = len(header_clean)
+    if expected_cols == 0:
+        return None
+    if _codec_name(encoding) == "utf-8-sig":
+        encoding = "utf-8"  # the BOM is part of the header line
+
+    def report(line, found):
+        status.had_error = True
+        print(f"Skipping malformed row {line} in {path.name}: expected {expected_cols} columns, found {found}")
+
+    def on_error(line, e):
+        status.had_error = True
+        print(f"CSV parsing error in {path.name} at line {line}: {e}")
+
+    def gen():
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            ranges = iter(zip(bounds, bounds[1:]))
+
+            def submit(n):
+                for start, end in itertools.islice(ranges, n):
+                    futures.append((start, executor.submit(parse_csv_chunk, path, start, end, encoding, expected_cols)))
+
+            futures = []
+            submit(2 * workers)
+            line_base = 1
+            while futures:
+                start, future = futures.pop(0)
+                submit(1)
+                batches, malformed, lines, split, error = future.result()
+                if split:
+                    break
+                for line, found in malformed:
+                    report(line_base + line, found)
+                if error:
+                    status.had_error = True
+                    print(f"{error} in {path.name} after line {line_base}")
+                yield from batches
+                line_base += lines
+            else:
+                return
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+        # serial fallback from the first chunk that may have been split inside a quoted field
+        with open(path, "rb") as f:
+            f.seek(start)
+            stream = io.TextIOWrapper(f, encoding=encoding, errors="replace", newline="")
+            yield from _csv_batches(
+                stream,
+                expected_cols,
+                lambda line, found: report(line_base + line, found),
+                lambda line, e: on_error(line_base + line, e),
+            )
+
+    return header_clean, gen(), status
+
+
+def read_csv_rows(path: Path) -> Tuple[List[str], Iterable[List[List[str]]], ReadStatus]:
+    """
+    Read header and a generator of row batches (lists of up to ROW_BATCH_SIZE rows) from CSV file.
+    Uses pyarrow for UTF-8 files when installed, otherwise the csv module
+    (split across worker processes for large files).
+    Returns: (header_list, batches_generator, had_error)
+    - had_error is true if any row was skipped or a parse/decoding error occurred;
+      it is set as the batches are read, so check it after consuming them.
     """
-    had_error = False
     # detect encoding and try strict first then replace
     enc = detect_encoding(path)
 
+    if pacsv is not None:
+        result = _read_csv_rows_arrow(path, enc)
+        if result is not None:
+            return result
+
+    # otherwise split big files across processes (not from inside a pool worker)
+    workers = os.cpu_count() or 1
+    try:
+        size = path.stat().st_size
+    except OSError:
+        size = 0
+    if (
+        size >= PARALLEL_CSV_MIN_SIZE
+        and workers > 1
+        and multiprocessing.parent_process() is None
+        and _codec_name(enc) in SPLITTABLE_ENCODINGS
+    ):
+        result = _read_csv_rows_chunked(path, enc, size, workers)
+        if result is not None:
+            return result
+
+    status = ReadStatus()
+
     def _open_reader(encoding: str, errors: str):
-        f = open(path, "r", encoding=encoding, errors=errors, newline="")
+        f = open_sequential(path, encoding, errors)
         reader = csv.reader(f)
         return f, reader
 
@@ -132,210 +596,473 @@ def read_csv_rows(path: Path) -> Tuple[List[str], Iterable[List[str]], bool]:
             try:
                 header = next(reader)
             except StopIteration:
-                f.close()
-                return [], iter([]), had_error
+                close_sequential(f)
+                return [], iter([]), status
             header_clean = [h.strip() for h in header]
             expected_cols = len(header_clean)
 
+            def on_malformed(line, found):
+                status.had_error = True
+                print(f"Skipping malformed row {line + 1} in {path.name}: expected {expected_cols} columns, found {found}")
+
+            def on_error(line, e):
+                status.had_error = True
+                if isinstance(e, csv.Error):
+                    print(f"CSV parsing error in {path.name} at line {line + 1}: {e}")
+                else:
+                    print(f"Unexpected error reading {path.name} at line {line + 1}: {e}")
+
             def gen():
-                nonlocal had_error
-                line_no = 1
                 try:
-                    for row in reader:
-                        line_no += 1
-                        if len(row) == 0 or all((c is None or str(c).strip() == "") for c in row):
-                            continue
-                        if len(row) != expected_cols:
-                            had_error = True
-                            print(
-                                f"Skipping malformed row {line_no} in {path.name}: expected {expected_cols} columns, found {len(row)}"
-                            )
-                            continue
-                        yield [c for c in row]
-                except csv.Error as e:
-                    had_error = True
-                    print(f"CSV parsing error in {path.name} at line {line_no}: {e}")
-                except Exception as e:
-                    had_error = True
-                    print(f"Unexpected error reading {path.name} at line {line_no}: {e}")
+                    yield from _csv_batches(f, expected_cols, on_malformed, on_error)
                 finally:
                     try:
-                        f.close()
+                        close_sequential(f)
                     except Exception:
                         pass
 
-            return header_clean, gen(), had_error
+            return header_clean, gen(), status
         except UnicodeDecodeError:
             # try next attempt
             continue
         except csv.Error as e:
             # CSV module error while opening/reading
-            had_error = True
+            status.had_error = True
             print(f"csv.Error while opening {path.name}: {e}")
             # try next attempt (replace)
             continue
         except Exception as e:
-            had_error = True
+            status.had_error = True
             print(f"Error reading CSV {path.name}: {e}")
-            return [], iter([]), had_error
+            return [], iter([]), status
 
-    return [], iter([]), True
+    return [], iter([]), ReadStatus(True)
 
 
-def read_excel_rows(path: Path) -> Tuple[List[str], Iterable[List[str]], bool]:
+def _calamine_cell(c):
+    # calamine reports every number as float and date-only cells as date;
+    # match openpyxl so the output reads "1" rather than "1.0" and
+    # "2024-01-02 00:00:00" rather than "2024-01-02"
+    if type(c) is float:
+        return int(c) if c.is_integer() and -1e15 < c < 1e15 else c
+    if type(c) is datetime.date:
+        return datetime.datetime(c.year, c.month, c.day)
+    return c
+
+
+def _open_excel_rows(path: Path):
     """
-    Read header and rows from an Excel file using openpyxl.
-    Returns: (header_list, rows_generator, had_error)
+    Open the first worksheet of an Excel file, preferring python-calamine
+    and falling back to openpyxl.
+    Returns: (rows_iterator, close_callable)
     """
-    if openpyxl is None:
-        raise RuntimeError("openpyxl is required to read Excel files. Install with: pip install openpyxl")
-    had_error = False
+    if CalamineWorkbook is not None:
+        wb = CalamineWorkbook.from_path(str(path))
+        sheet = wb.get_sheet_by_index(0)
+        # calamine trims empty leading columns; pad them back so the header
+        # lines up from column A, as with openpyxl
+        pad = [""] * (sheet.start[1] if sheet.start else 0)
+        rows = (pad + [_calamine_cell(c) for c in row] for row in sheet.iter_rows())
+        return rows, getattr(wb, "close", lambda: None)
+    wb = openpyxl.load_workbook(filename=str(path), read_only=True, data_only=True)
+    ws = wb.worksheets[0]
+    return ws.iter_rows(values_only=True), wb.close
+
+
+def read_excel_rows(path: Path) -> Tuple[List[str], Iterable[List[List[str]]], ReadStatus]:
+    """
+    Read header and row batches from an Excel file using python-calamine or openpyxl.
+    Returns: (header_list, batches_generator, had_error)
+    """
+    if CalamineWorkbook is None and openpyxl is None:
+        raise RuntimeError(
+            "python-calamine or openpyxl is required to read Excel files. "
+            "Install with: pip install python-calamine"
+        )
+    status = ReadStatus()
     try:
-        wb = openpyxl.load_workbook(filename=str(path), read_only=True, data_only=True)
-        ws = wb.worksheets[0]
-        rows = ws.iter_rows(values_only=True)
+        rows, close_wb = _open_excel_rows(path)
         try:
             header_row = next(rows)
         except StopIteration:
-            wb.close()
-            return [], iter([]), had_error
+            close_wb()
+            return [], iter([]), status
         header = [str(c).strip() if c is not None else "" for c in header_row]
         expected_cols = len(header)
 
         def gen():
-            nonlocal had_error
             line_no = 1
+            batch = []
             try:
                 for row in rows:
                     line_no += 1
                     row_list = ["" if c is None else str(c) for c in row]
                     if len(row_list) != expected_cols:
-                        had_error = True
+                        status.had_error = True
                         print(
                             f"Skipping malformed row {line_no} in {path.name}: expected {expected_cols} columns, found {len(row_list)}"
                         )
                         continue
-                    yield row_list
+                    batch.append(row_list)
+                    if len(batch) >= ROW_BATCH_SIZE:
+                        yield batch
+                        batch = []
             except Exception as e:
-                had_error = True
+                status.had_error = True
                 print(f"Error while iterating rows in {path.name} at row {line_no}: {e}")
             finally:
                 try:
-                    wb.close()
+                    close_wb()
                 except Exception:
                     pass
+            if batch:
+                yield batch
 
-        return header, gen(), had_error
+        return header, gen(), status
     except Exception as e:
         print(f"Error reading Excel {path.name}: {e}")
-        return [], iter([]), True
+        return [], iter([]), ReadStatus(True)
 
 
-def write_row_to_csv(path: Path, header: List[str], rows: Iterable[List[str]], append: bool = True) -> int:
+class MergedCsvWriter:
     """
-    Write header (if file is created) and rows into path.
-    Returns number of rows written (not counting header).
+    Single writer thread for all merged outputs.
+    Callers queue row batches with write(); each output file is opened on its
+    first write() and kept open with one csv.writer for the whole run, and the
+    thread closes them all in close().
     """
-    mode = "a" if append and path.exists() else "w"
-    path.parent.mkdir(parents=True, exist_ok=True)
-    written = 0
-    with path.open(mode, newline="", encoding="utf-8") as f:
+
+    def __init__(self, max_pending: int = 64):
+        self.errors: Dict[Path, Exception] = {}
+        self._queue: "queue.Queue[Optional[Tuple[Path, List[List[str]]]]]" = queue.Queue(maxsize=max_pending)
+        self._files = {}
+        self._writers = {}
+        self._thread = threading.Thread(target=self._run, name="merged-csv-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, path: Path, header: List[str], batches: Iterable[List[List[str]]]) -> int:
+        """
+        Queue row batches for path. The header is written when path is first created.
+        Returns number of rows queued (not counting header).
+        Raises if path cannot be opened, or the earlier write error if path has already failed.
+        """
+        if path in self.errors:
+            raise self.errors[path]
+        if path not in self._writers:
+            # open here rather than in the thread, so a bad output path fails this call
+            self._open(path, header)
+        written = 0
+        for batch in batches:
+            self._queue.put((path, batch))
+            written += len(batch)
+        return written
+
+    def close(self) -> Dict[Path, Exception]:
+        """
+        Flush queued rows, close every output file and stop the thread.
+        Returns write errors keyed by output path.
+        """
+        self._queue.put(None)
+        self._thread.join()
+        return self.errors
+
+    def _open(self, path: Path, header: List[str]):
+        # O_EXCL tells us atomically whether this run creates the file (and so
+        # writes the header) or appends to an output left by an earlier run
+        binary = getattr(os, "O_BINARY", 0)
+        try:
+            # 0o666 (less the umask) is what open(path, "w") would use
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | binary, 0o666)
+            created = True
+        except FileExistsError:
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | binary)
+            created = False
+        # large buffer so each write() syscall carries megabytes, not 8 KB
+        f = open(fd, "w", buffering=OUTPUT_BUFFER_SIZE, newline="", encoding="utf-8")
+        self._files[path] = f
         writer = csv.writer(f)
-        if mode == "w":
+        if created:
             writer.writerow(header)
-        for row in rows:
-            writer.writerow(row)
-            written += 1
-    return written
+        self._writers[path] = writer
 
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            path, batch = item
+            if path in self.errors:
+                continue
+            try:
+                self._writers[path].writerows(batch)
+            except Exception as e:
+                self.errors[path] = e
+        for path, f in self._files.items():
+            try:
+                f.close()
+            except Exception as e:
+                self.errors.setdefault(path, e)
 
-def process_files(files: List[Path]):
-    if not files:
-        print("No files provided.")
+
+def duplicate_file(src: Path, dest: Path) -> Path:
+    """
+    Put a copy of src at dest, or at dest_1, dest_2, ... when that name is taken.
+    Names are claimed atomically (link / O_EXCL) rather than probed with exists().
+    The copy is as cheap as the filesystem allows: a hard link, then an
+    in-kernel copy_file_range, then shutil.copy2.
+    Returns the path that was written.
+    """
+    try_link = True
+    for i in itertools.count():
+        candidate = dest if i == 0 else dest.with_name(f"{dest.stem}_{i}{dest.suffix}")
+        if try_link:
+            try:
+                os.link(src, candidate)
+                return candidate
+            except FileExistsError:
+                continue
+            except OSError:
+                try_link = False
+        try:
+            fd = os.open(candidate, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+        except FileExistsError:
+            continue
+        try:
+            copied = False
+            with os.fdopen(fd, "wb") as fdst:
+                if hasattr(os, "copy_file_range"):
+                    try:
+                        with open(src, "rb") as fsrc:
+                            while os.copy_file_range(fsrc.fileno(), fdst.fileno(), 1 << 30) > 0:
+                                pass
+                        copied = True
+                    except OSError:
+                        pass
+            if copied:
+                shutil.copystat(src, candidate)
+            else:
+                shutil.copy2(src, candidate)
+        except BaseException:
+            # don't leave the claimed name behind as an empty or partial file
+            try:
+                os.unlink(candidate)
+            except OSError:
+                pass
+            raise
+        return candidate
+
+
+def read_rows_materialized(path: Path) -> Tuple[List[str], List[List[List[str]]], bool]:
+    """
+    Read a CSV/Excel file fully into memory.
+    Used as the worker for parallel reads: batches are materialized into a list
+    so they can be sent back across the process boundary.
+    Returns: (header_list, batches_list, had_error)
+    """
+    if path.suffix.lower() in CSV_EXTENSIONS:
+        header, batches, had_error = read_csv_rows(path)
+    else:
+        header, batches, had_error = read_excel_rows(path)
+    batches = list(batches)
+    # the flag is final only now that every batch has been read
+    return header, batches, bool(had_error)
+
+
+def _process_one(
+    path: Path,
+    future,
+    writer: MergedCsvWriter,
+    out_paths: Dict[str, Path],
+    sources: Dict[Path, List[Tuple[Path, int]]],
+    output_dir: Path,
+    error_dir: Path,
+    stats: dict,
+):
+    """
+    Merge a single input file into its header group's output CSV.
+    future, if given, holds the result of read_rows_materialized(path)
+    computed in a worker process.
+    out_paths maps header keys seen so far to their output paths; sources
+    records (input, rows queued) per output, so write errors reported by
+    writer.close() can be traced back to the inputs.
+    """
+    stats["files_processed"] += 1
+    print(f"\nProcessing: {path}")
+    if not path.exists():
+        print(f"  Skipping missing file: {path}")
         return
 
-    parents = [str(p.parent) for p in files]
-    common_parent = Path(os.path.commonpath(parents))
-    output_dir = common_parent
-    print(f"Saving merged outputs into: {output_dir}")
+    ext = path.suffix.lower()
+    if future is not None:
+        header, batches, had_error = future.result()
+    elif ext in CSV_EXTENSIONS:
+        header, batches, had_error = read_csv_rows(path)
+    elif ext in EXCEL_EXTENSIONS:
+        header, batches, had_error = read_excel_rows(path)
+    else:
+        print(f"  Unsupported file type {ext}, skipping.")
+        return
 
-    error_dir = output_dir / "error_files"
-    error_dir.mkdir(parents=True, exist_ok=True)
+    if not header:
+        print(f"  Empty or unreadable header in {path.name}, skipping file.")
+        if had_error:
+            _copy_to_error_dir(path, error_dir, stats)
+        return
 
-    stats = {"files_processed": 0, "files_with_errors": [], "merged_files": {}}
+    header_key, key_bytes, expected_cols = sanitize_header(header)
+    # name each header group's output once per run
+    out_path = out_paths.get(header_key)
+    if out_path is None:
+        out_path = out_paths[header_key] = merged_output_path(output_dir, header_key, key_bytes)
 
-    for path in files:
-        stats["files_processed"] += 1
-        print(f"\nProcessing: {path}")
-        if not path.exists():
-            print(f"  Skipping missing file: {path}")
-            continue
+    try:
+        rows_written = writer.write(out_path, header, batches)
+    except Exception as e:
+        print(f"  Failed to write rows from {path.name} into {out_path.name}: {e}")
+        had_error = True
+        rows_written = 0
+    else:
+        sources.setdefault(out_path, []).append((path, rows_written))
+
+    print(f"  Merged into {out_path.name} (rows added: {rows_written})")
+    stats["merged_files"].setdefault(out_path.name, 0)
+    stats["merged_files"][out_path.name] += rows_written
 
-        ext = path.suffix.lower()
-        if ext in (".csv", ".txt"):
-            header, rows_iter, had_error = read_csv_rows(path)
-        elif ext in (".xlsx", ".xlsm", ".xltx", ".xltm", ".xls"):
-            header, rows_iter, had_error = read_excel_rows(path)
+    if had_error:
+        _copy_to_error_dir(path, error_dir, stats)
+
+
+def _copy_to_error_dir(path: Path, error_dir: Path, stats: dict):
+    """Copy (or hard-link) an input that had errors into error_dir and list it in the summary."""
+    try:
+        dest = duplicate_file(path, error_dir / path.name)
+        stats["files_with_errors"].append(path)
+        if os.path.samefile(path, dest):
+            # a hard link, not a snapshot: edits made in place affect the original too
+            print(f"  Linked original {path.name} to {dest} (hard link, same file as the input)")
         else:
-            print(f"  Unsupported file type {ext}, skipping.")
-            continue
+            print(f"  Copied original {path.name} to {dest}")
+    except Exception as e:
+        print(f"  Failed to copy file with errors: {e}")
 
-        if not header:
-            print(f"  Empty or unreadable header in {path.name}, skipping file.")
-            if had_error:
-                dest = error_dir / path.name
-                if dest.exists():
-                    i = 1
-                    while True:
-                        newname = dest.with_name(f"{dest.stem}_{i}{dest.suffix}")
-                        if not newname.exists():
-                            dest = newname
-                            break
-                        i += 1
-                try:
-                    shutil.copy2(path, dest)
-                    stats["files_with_errors"].append(path)
-                    print(f"  Copied original {path.name} to {dest}")
-                except Exception as e:
-                    print(f"  Failed to copy file with errors: {e}")
-            continue
 
-        header_key, expected_cols = sanitize_header(header)
-        safe_name = sanitize_filename(header_key)
-        hhash = hashlib.sha1(header_key.encode("utf-8")).hexdigest()[:8]
-        out_name = f"merged_{safe_name}_{hhash}.csv"
-        out_path = output_dir / out_name
-        first_time = not out_path.exists()
+def file_fingerprint(path: Path, sample_size: int = 65536) -> Tuple[int, str]:
+    """Cheap content fingerprint: file size plus a hash of the first and last sample_size bytes."""
+    size = path.stat().st_size
+    with path.open("rb") as f:
+        data = f.read(sample_size)
+        if size > sample_size:
+            f.seek(max(sample_size, size - sample_size))
+            data += f.read(sample_size)
+    return size, short_hash(data)
 
+
+def find_duplicate_inputs(files: List[Path]) -> Dict[int, Path]:
+    """
+    Find inputs whose content repeats an earlier input.
+    Fingerprint matches are confirmed with samefile()/a full comparison,
+    so files that only share a size, head and tail are not dropped.
+    Returns: {index in files: earlier path with the same content}
+    """
+    seen: Dict[Tuple[int, str], List[Path]] = {}
+    duplicates = {}
+    for i, path in enumerate(files):
         try:
-            rows_written = write_row_to_csv(out_path, header, rows_iter, append=not first_time)
-        except Exception as e:
-            print(f"  Failed to write rows from {path.name} into {out_path.name}: {e}")
-            had_error = True
-            rows_written = 0
+            key = file_fingerprint(path)
+        except OSError:
+            continue
+        for earlier in seen.get(key, []):
+            try:
+                if os.path.samefile(earlier, path) or filecmp.cmp(earlier, path, shallow=False):
+                    duplicates[i] = earlier
+                    break
+            except OSError:
+                continue
+        else:
+            seen.setdefault(key, []).append(path)
+    return duplicates
 
-        print(f"  Merged into {out_path.name} (rows added: {rows_written})")
-        stats["merged_files"].setdefault(out_path.name, 0)
-        stats["merged_files"][out_path.name] += rows_written
 
-        if had_error:
-            dest = error_dir / path.name
-            if dest.exists():
-                i = 1
-                while True:
-                    newname = dest.with_name(f"{dest.stem}_{i}{dest.suffix}")
-                    if not newname.exists():
-                        dest = newname
-                        break
-                    i += 1
+def concat_same_header_csvs(files: List[Path], output_dir: Path) -> Optional[Tuple[Path, List[int]]]:
+    """
+    Fast path for --concat: if every input is a UTF-8 CSV with the same header,
+    write the header once and copy each file's body byte-for-byte.
+    Bodies are not parsed, so malformed rows are NOT skipped, but they are
+    checked to be valid UTF-8 as they are copied; if one isn't, the output is
+    rolled back and None is returned.
+    Returns: (output_path, lines_copied_per_file), or None if the inputs don't qualify.
+    """
+    header = None
+    for path in files:
+        if path.suffix.lower() not in CSV_EXTENSIONS:
+            return None
+        if _codec_name(detect_encoding(path)) not in UTF8_ENCODINGS:
+            return None
+        try:
+            with open(path, "r", encoding="utf-8-sig", newline="") as f:
+                line = f.readline()
+        except (OSError, UnicodeDecodeError):
+            return None
+        # a quoted header spanning several lines can't be skipped with readline(),
+        # and the body copy below skips it with a binary readline(), which only
+        # stops at \n: classic Mac (CR-only) line endings don't qualify
+        if line.count('"') % 2 or line.endswith("\r"):
+            return None
+        row = [h.strip() for h in next(csv.reader([line]), [])]
+        if not row or (header is not None and row != header):
+            return None
+        header = row
+    if header is None:
+        return None
+
+    header_key, key_bytes, _ = sanitize_header(header)
+    out_path = merged_output_path(output_dir, header_key, key_bytes)
+    try:
+        dst = open(out_path, "xb")
+        created = True
+    except FileExistsError:
+        dst = open(out_path, "ab")
+        created = False
+    counts = []
+    with dst:
+        original_size = os.fstat(dst.fileno()).st_size
+        if created:
+            header_line = io.StringIO()
+            csv.writer(header_line).writerow(header)
+            dst.write(header_line.getvalue().encode("utf-8"))
+        for path in files:
+            lines = 0
+            last = b""
+            # encoding detection only sampled the start of the file
+            decoder = codecs.getincrementaldecoder("utf-8")()
             try:
-                shutil.copy2(path, dest)
-                stats["files_with_errors"].append(path)
-                print(f"  Copied original {path.name} to {dest}")
-            except Exception as e:
-                print(f"  Failed to copy file with errors: {e}")
+                with open(path, "rb") as src:
+                    src.readline()
+                    while True:
+                        chunk = src.read(OUTPUT_BUFFER_SIZE)
+                        decoder.decode(chunk, final=not chunk)
+                        if not chunk:
+                            break
+                        dst.write(chunk)
+                        lines += chunk.count(b"\n")
+                        last = chunk[-1:]
+            except UnicodeDecodeError as e:
+                print(f"{path.name} is not valid UTF-8 ({e}).")
+                dst.flush()
+                dst.truncate(original_size)
+                break
+            if last and last != b"\n":
+                dst.write(b"\r\n")
+                lines += 1
+            counts.append(lines)
+    if len(counts) < len(files):
+        if created:
+            out_path.unlink()
+        return None
+    return out_path, counts
+
 
-    # Summary
+def _print_summary(stats: dict, error_dir: Path, unit: str = "rows"):
     print("\n=== Summary ===")
     print(f"Files processed: {stats['files_processed']}")
     if stats["files_with_errors"]:
@@ -346,8 +1073,100 @@ def process_files(files: List[Path]):
         print("No files had malformed rows.")
 
     print("Merged files produced in:")
-    for name, rows in stats["merged_files"].items():
-        print(f"  - {name} (rows added: {rows})")
+    for name, count in stats["merged_files"].items():
+        print(f"  - {name} ({unit} added: {count})")
+
+
+def process_files(files: List[Path], concat: bool = False):
+    """
+    Merge files by header into CSVs in their common parent folder.
+    concat: try the byte-copy fast path (see concat_same_header_csvs) first.
+    """
+    if not files:
+        print("No files provided.")
+        return
+
+    parents = [str(p.parent) for p in files]
+    common_parent = Path(os.path.commonpath(parents))
+    output_dir = common_parent
+    print(f"Saving merged outputs into: {output_dir}")
+
+    error_dir = output_dir / "error_files"
+    error_dir.mkdir(parents=True, exist_ok=True)
+
+    stats = {"files_processed": 0, "files_with_errors": [], "merged_files": {}}
+
+    duplicates = find_duplicate_inputs(files)
+
+    if concat:
+        unique_files = [p for i, p in enumerate(files) if i not in duplicates]
+        result = concat_same_header_csvs(unique_files, output_dir)
+        if result is None:
+            print("Inputs don't all share one header and UTF-8 encoding; merging row by row.")
+        else:
+            out_path, counts = result
+            copied = iter(counts)
+            for i, path in enumerate(files):
+                print(f"\nProcessing: {path}")
+                if i in duplicates:
+                    print(f"  Skipping duplicate of {duplicates[i]}")
+                else:
+                    print(f"  Copied into {out_path.name} (lines added: {next(copied)})")
+            stats["files_processed"] = len(files)
+            stats["merged_files"][out_path.name] = sum(counts)
+            # bodies weren't parsed, so only physical lines were counted
+            _print_summary(stats, error_dir, unit="lines")
+            return
+
+    # With many inputs, parse files in worker processes; writes stay in this process
+    # and results are consumed in input order so the merged output is deterministic.
+    # Only a window of 2 x workers files is in flight at once, so finished
+    # (fully materialized) results don't pile up in this process.
+    workers = os.cpu_count() or 1
+    executor = None
+    futures = {}
+    to_submit = iter([])
+    if workers > 1 and len(files) > 2 * workers:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        to_submit = iter([
+            i for i, path in enumerate(files)
+            if i not in duplicates and path.suffix.lower() in CSV_EXTENSIONS + EXCEL_EXTENSIONS and path.exists()
+        ])
+        for i in itertools.islice(to_submit, 2 * workers):
+            futures[i] = executor.submit(read_rows_materialized, files[i])
+
+    writer = MergedCsvWriter()
+    out_paths: Dict[str, Path] = {}
+    sources: Dict[Path, List[Tuple[Path, int]]] = {}
+    try:
+        for i, path in enumerate(files):
+            if i in duplicates:
+                stats["files_processed"] += 1
+                print(f"\nProcessing: {path}")
+                print(f"  Skipping duplicate of {duplicates[i]}")
+                continue
+            future = futures.pop(i, None)
+            if future is not None:
+                # top the window back up before blocking on this result
+                for j in itertools.islice(to_submit, 1):
+                    futures[j] = executor.submit(read_rows_materialized, files[j])
+            _process_one(path, future, writer, out_paths, sources, output_dir, error_dir, stats)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        write_errors = writer.close()
+
+    # rows are written in the background, so a failure (e.g. disk full) only
+    # surfaces here; every input that fed the failed output is suspect
+    for out_path, e in write_errors.items():
+        print(f"\nFailed to write rows into {out_path.name}: {e}")
+        for src, rows in sources.get(out_path, []):
+            print(f"  Rows from {src.name} may be missing")
+            stats["merged_files"][out_path.name] -= rows
+            if src not in stats["files_with_errors"]:
+                _copy_to_error_dir(src, error_dir, stats)
+
+    _print_summary(stats, error_dir)
 
 
 def choose_files_via_dialog() -> List[Path]:
@@ -370,6 +1189,12 @@ def choose_files_via_dialog() -> List[Path]:
 def main():
     parser = argparse.ArgumentParser(description="Merge multiple CSV/Excel files that share the same header into CSV outputs.")
     parser.add_argument("files", nargs="*", help="Files to merge (CSV/Excel). If omitted, a file chooser dialog opens).")
+    parser.add_argument(
+        "--concat",
+        action="store_true",
+        help="If all inputs are UTF-8 CSVs with the same header, copy their rows verbatim without re-parsing "
+        "(much faster, but malformed rows are not skipped).",
+    )
     args = parser.parse_args()
 
     if args.files:
@@ -380,7 +1205,7 @@ def main():
             print("No files selected. Exiting.")
             sys.exit(0)
 
-    process_files(files)
+    process_files(files, concat=args.concat)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,298 @@
+import contextlib
+import datetime
+import errno
+import io
+import os
+import stat
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import merge_excel_csv_by_header as merge  # noqa: E402
+
+
+def read_all(path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        header, batches, had_error = merge.read_csv_rows(path)
+        rows = [list(row) for batch in batches for row in batch]
+    return header, rows, bool(had_error)
+
+
+class ChunkedCsvReadTest(unittest.TestCase):
+    # an unquoted field with a literal quote, then a quoted field spanning lines
+    DATA = b'a,b,c\n1,5" pipe,z\n2,"line1\n3,x,y\n4,x,y\nend",z\n5,q,r\n'
+    EXPECTED = [
+        ["1", '5" pipe', "z"],
+        ["2", "line1\n3,x,y\n4,x,y\nend", "z"],
+        ["5", "q", "r"],
+    ]
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "quoted.csv"
+        self.path.write_bytes(self.DATA)
+        for patcher in (
+            mock.patch.object(merge, "pacsv", None),
+            mock.patch.object(merge, "PARALLEL_CSV_MIN_SIZE", 1),
+            mock.patch.object(os, "cpu_count", lambda: 4),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_serial_read(self):
+        with mock.patch.object(merge, "PARALLEL_CSV_MIN_SIZE", len(self.DATA) + 1):
+            self.assertEqual(read_all(self.path), (["a", "b", "c"], self.EXPECTED, False))
+
+    def test_chunk_split_inside_quoted_field(self):
+        for chunk_size in range(12, 33):
+            with self.subTest(chunk_size=chunk_size):
+                with mock.patch.object(merge, "PARALLEL_CSV_CHUNK_SIZE", chunk_size):
+                    self.assertEqual(read_all(self.path), (["a", "b", "c"], self.EXPECTED, False))
+
+    def test_cr_only_line_endings(self):
+        for data in (b"a,b\r1,2\r3,4\r", b"a,b\n1,2\r3,4\r5,6\r"):
+            with self.subTest(data=data):
+                self.path.write_bytes(data)
+                with mock.patch.object(merge, "PARALLEL_CSV_CHUNK_SIZE", 4):
+                    chunked = read_all(self.path)
+                with mock.patch.object(merge, "PARALLEL_CSV_MIN_SIZE", len(data) + 1):
+                    serial = read_all(self.path)
+                self.assertEqual(chunked, serial)
+                self.assertFalse(serial[2])
+
+
+@unittest.skipIf(merge.pacsv is None, "pyarrow is not installed")
+class ArrowCsvReadTest(unittest.TestCase):
+    """The arrow reader must give the same rows and error flag as the csv module."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+
+    def assertSameAsCsvModule(self, data, had_error):
+        path = self.dir / "data.csv"
+        path.write_bytes(data)
+        with mock.patch.object(merge, "_read_csv_rows_chunked", None):
+            arrow = read_all(path)
+            with mock.patch.object(merge, "pacsv", None):
+                serial = read_all(path)
+        self.assertEqual(arrow, serial)
+        self.assertEqual(arrow[2], had_error)
+        return arrow
+
+    def test_quoted_header_spanning_lines(self):
+        header, rows, _ = self.assertSameAsCsvModule(b'"h\n1",h2\na,b\n', False)
+        self.assertEqual((header, rows), (["h\n1", "h2"], [["a", "b"]]))
+
+    def test_blank_looking_malformed_rows_are_reported(self):
+        for line in (b'" , "', b' "",,'):
+            with self.subTest(line=line):
+                _, rows, _ = self.assertSameAsCsvModule(b"a,b\n1,2\n" + line + b"\n3,4\n", True)
+                self.assertEqual(rows, [["1", "2"], ["3", "4"]])
+
+    def test_quote_only_cells_are_kept(self):
+        _, rows, _ = self.assertSameAsCsvModule(b'a,b\n,""""\n', False)
+        self.assertEqual(rows, [["", '"']])
+
+    def test_blank_lines_are_skipped_quietly(self):
+        _, rows, _ = self.assertSameAsCsvModule(b'a,b\n1,2\n\n,\n""\n3,4\n', False)
+        self.assertEqual(rows, [["1", "2"], ["3", "4"]])
+
+    def test_invalid_utf8_in_a_later_block_keeps_earlier_rows(self):
+        lines = [b"a,b"] + [b"%d,x" % i for i in range(3000)]
+        lines[2500] = b"bad"
+        lines.insert(2000, b"caf\xe9,1")
+        path = self.dir / "data.csv"
+        path.write_bytes(b"\n".join(lines) + b"\n")
+        # in a real file the byte lies past the sample detect_encoding looks at
+        with mock.patch.object(merge, "ARROW_BLOCK_SIZE", 4096), mock.patch.object(
+            merge, "detect_encoding", lambda p: "utf-8"
+        ):
+            header, rows, had_error = read_all(path)
+        expected = [[str(i), "x"] for i in range(3000) if i != 2499]
+        expected.insert(1999, ["caf\ufffd", "1"])
+        self.assertEqual((header, rows, had_error), (["a", "b"], expected, True))
+
+
+class CalamineCellTest(unittest.TestCase):
+    """calamine cells are converted to what openpyxl would return."""
+
+    def test_whole_floats_become_int(self):
+        self.assertEqual([merge._calamine_cell(c) for c in (1.0, -3.0, 2.5)], [1, -3, 2.5])
+        self.assertIs(type(merge._calamine_cell(1.0)), int)
+
+    def test_huge_floats_stay_float(self):
+        self.assertIs(type(merge._calamine_cell(1e16)), float)
+
+    def test_date_becomes_midnight_datetime(self):
+        self.assertEqual(merge._calamine_cell(datetime.date(2024, 1, 2)), datetime.datetime(2024, 1, 2))
+        stamp = datetime.datetime(2024, 1, 2, 3, 4, 5)
+        self.assertIs(merge._calamine_cell(stamp), stamp)
+
+    def test_other_cells_unchanged(self):
+        for cell in ("", "x", True, datetime.time(3, 4)):
+            self.assertIs(merge._calamine_cell(cell), cell)
+
+
+class FindDuplicateInputsTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+
+    def write(self, name, data):
+        path = self.dir / name
+        path.write_bytes(data)
+        return path
+
+    def test_same_content_is_a_duplicate(self):
+        a = self.write("a.csv", b"a,b\n1,2\n")
+        b = self.write("b.csv", b"a,b\n3,4\n")
+        copy = self.write("copy.csv", b"a,b\n1,2\n")
+        self.assertEqual(merge.find_duplicate_inputs([a, b, copy, a]), {2: a, 3: a})
+
+    def test_same_fingerprint_different_middle_is_kept(self):
+        # fingerprints only sample the head and tail
+        body = b"x" * (3 * 65536)
+        a = self.write("a.csv", b"a\n" + body + b"\n")
+        b = self.write("b.csv", b"a\n" + body[:65536] + b"y" + body[65537:] + b"\n")
+        self.assertEqual(merge.file_fingerprint(a), merge.file_fingerprint(b))
+        self.assertEqual(merge.find_duplicate_inputs([a, b]), {})
+
+    def test_missing_file_is_ignored(self):
+        a = self.write("a.csv", b"a\n1\n")
+        self.assertEqual(merge.find_duplicate_inputs([self.dir / "missing.csv", a]), {})
+
+
+class DuplicateFileTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.src = self.dir / "in.csv"
+        self.src.write_bytes(b"a,b\n1,2\n")
+        (self.dir / "errors").mkdir()
+        self.dest = self.dir / "errors" / "in.csv"
+
+    def test_taken_names_get_a_suffix(self):
+        names = [merge.duplicate_file(self.src, self.dest).name for _ in range(3)]
+        self.assertEqual(names, ["in.csv", "in_1.csv", "in_2.csv"])
+        for name in names:
+            self.assertEqual((self.dest.parent / name).read_bytes(), self.src.read_bytes())
+
+    def test_copies_when_hard_links_fail(self):
+        cross_device = OSError(errno.EXDEV, "Invalid cross-device link")
+        with mock.patch.object(os, "link", side_effect=cross_device):
+            first = merge.duplicate_file(self.src, self.dest)
+            second = merge.duplicate_file(self.src, self.dest)
+        self.assertEqual((first.name, second.name), ("in.csv", "in_1.csv"))
+        self.assertFalse(os.path.samefile(first, self.src))
+        self.assertEqual(second.read_bytes(), self.src.read_bytes())
+
+    def test_copies_without_copy_file_range(self):
+        with mock.patch.object(os, "link", side_effect=OSError(errno.EPERM, "no links")), mock.patch.object(
+            os, "copy_file_range", side_effect=OSError(errno.ENOSYS, "no copy_file_range"), create=True
+        ):
+            copy = merge.duplicate_file(self.src, self.dest)
+        self.assertEqual(copy.read_bytes(), self.src.read_bytes())
+
+    def test_failed_copy_leaves_no_placeholder(self):
+        with mock.patch.object(os, "link", side_effect=OSError(errno.EXDEV, "cross-device")), mock.patch.object(
+            os, "copy_file_range", side_effect=OSError(errno.ENOSYS, "no copy_file_range"), create=True
+        ), mock.patch.object(merge.shutil, "copy2", side_effect=OSError(errno.ENOSPC, "disk full")):
+            with self.assertRaises(OSError):
+                merge.duplicate_file(self.src, self.dest)
+        self.assertEqual(list(self.dest.parent.iterdir()), [])
+
+
+@unittest.skipUnless(os.name == "posix", "file modes are POSIX-specific")
+class CreatedFileModeTest(unittest.TestCase):
+    """Files the script creates get the usual 0o666 & ~umask, never execute bits."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        old_umask = os.umask(0o022)
+        self.addCleanup(os.umask, old_umask)
+
+    def mode(self, path):
+        return stat.S_IMODE(path.stat().st_mode)
+
+    def test_merged_output(self):
+        writer = merge.MergedCsvWriter()
+        out_path = self.dir / "merged.csv"
+        writer.write(out_path, ["a"], [[["1"]]])
+        self.assertEqual(writer.close(), {})
+        self.assertEqual(self.mode(out_path), 0o644)
+
+    def test_error_file_copy(self):
+        src = self.dir / "in.csv"
+        src.write_bytes(b"a\n1\n")
+        os.chmod(src, 0o600)
+        with mock.patch.object(os, "link", side_effect=OSError(errno.EXDEV, "cross-device")), mock.patch.object(
+            os, "copy_file_range", side_effect=OSError(errno.ENOSYS, "no copy_file_range"), create=True
+        ), mock.patch.object(merge.shutil, "copystat"), mock.patch.object(merge.shutil, "copy2", merge.shutil.copyfile):
+            copy = merge.duplicate_file(src, self.dir / "copy.csv")
+        self.assertEqual(self.mode(copy), 0o644)
+
+
+class ConcatSameHeaderTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.out = self.dir / "out"
+        self.out.mkdir()
+
+    def write(self, name, data):
+        path = self.dir / name
+        path.write_bytes(data)
+        return path
+
+    def concat(self, *files):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return merge.concat_same_header_csvs(list(files), self.out)
+
+    def test_bodies_are_appended_under_one_header(self):
+        a = self.write("a.csv", b"a,b\r\n1,2\r\n")
+        b = self.write("b.csv", b"\xef\xbb\xbfa,b\n3,4")
+        out_path, counts = self.concat(a, b)
+        self.assertEqual(out_path.read_bytes(), b"a,b\r\n1,2\r\n3,4\r\n")
+        self.assertEqual(counts, [1, 1])
+
+    def test_cr_only_line_endings_do_not_qualify(self):
+        a = self.write("a.csv", b"h1,h2\ra,b\rc,d\r")
+        b = self.write("b.csv", b"h1,h2\ne,f\n")
+        self.assertIsNone(self.concat(a, b))
+        self.assertIsNone(self.concat(b, a))
+        self.assertEqual(list(self.out.iterdir()), [])
+
+    def test_quoted_header_spanning_lines_does_not_qualify(self):
+        a = self.write("a.csv", b'"h\n1",h2\na,b\n')
+        self.assertIsNone(self.concat(a, a))
+
+    def test_cr_only_file_keeps_its_rows(self):
+        # --concat falls back to the normal merge for it
+        a = self.write("a.csv", b"h1,h2\ra,b\rc,d\r")
+        b = self.write("b.csv", b"h1,h2\ne,f\n")
+        with contextlib.redirect_stdout(io.StringIO()):
+            merge.process_files([a, b], concat=True)
+        (merged,) = self.dir.glob("merged_*.csv")
+        self.assertEqual(merged.read_bytes(), b"h1,h2\r\na,b\r\nc,d\r\ne,f\r\n")
+
+    def test_different_headers_do_not_qualify(self):
+        a = self.write("a.csv", b"a,b\n1,2\n")
+        b = self.write("b.csv", b"a,c\n3,4\n")
+        self.assertIsNone(self.concat(a, b))
+        self.assertEqual(list(self.out.iterdir()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()